@@ -0,0 +1,209 @@
+"""
+asyncio API: DES work runs in an executor so the event loop keeps serving other coroutines.
+
+encrypt()/decrypt() offload des_encrypt()/des_decrypt() as a single job. The stream
+helpers move raw bytes (not hex) from an asyncio.StreamReader or an async iterator of
+bytes, hand block-aligned chunks of at most chunk_size bytes to the executor one at a
+time, and await writer.drain() (or the consumer of the iterator) before reading more,
+so memory stays bounded and a slow sink throttles the source.
+
+executor may be any concurrent.futures executor; None uses the loop's default thread
+pool. Pure-Python DES holds the GIL, so a ProcessPoolExecutor gives the loop the most
+headroom (metrics are then recorded in the worker processes).
+"""
+
+import asyncio
+import functools
+import os
+import time
+from concurrent.futures import Executor
+from typing import AsyncIterable, AsyncIterator, Optional, Tuple, Union
+
+from . import cipher, metrics, stream
+from .helper import pkcs7_pad, pkcs7_unpad
+
+Source = Union[asyncio.StreamReader, AsyncIterable[bytes]]
+
+
+async def encrypt(
+    plaintext: str,
+    key: str,
+    mode: str = "ecb",
+    iv: Optional[str] = None,
+    compress: Optional[str] = None,
+    executor: Optional[Executor] = None,
+) -> Tuple[str, Optional[str]]:
+    """Async des_encrypt(); same arguments and result."""
+    loop = asyncio.get_running_loop()
+    job = functools.partial(cipher.des_encrypt, plaintext, key, mode=mode, iv=iv, compress=compress)
+    return await loop.run_in_executor(executor, job)
+
+
+async def decrypt(
+    ciphertext: str,
+    key: str,
+    mode: str = "ecb",
+    iv: Optional[str] = None,
+    executor: Optional[Executor] = None,
+) -> str:
+    """Async des_decrypt(); same arguments and result."""
+    loop = asyncio.get_running_loop()
+    job = functools.partial(cipher.des_decrypt, ciphertext, key, mode=mode, iv=iv)
+    return await loop.run_in_executor(executor, job)
+
+
+async def _read_pieces(source: Source, size: int) -> AsyncIterator[bytes]:
+    """Yield pieces of at most size bytes from a StreamReader or async iterable."""
+    if isinstance(source, asyncio.StreamReader):
+        while True:
+            piece = await source.read(size)
+            if not piece:
+                return
+            yield piece
+    else:
+        async for piece in source:
+            for i in range(0, len(piece), size):
+                yield piece[i:i + size]
+
+
+def _prepare(key: str, mode: str, iv: Optional[str], op: str, chunk_size: Optional[int]):
+    """Validate arguments; returns (mode, round_keys, iv bytes or None, block-aligned chunk size)."""
+    mode = mode.lower()
+    if mode not in ("ecb", "cfb"):
+        metrics.METRICS.record_error(op, "unsupported_mode")
+        raise ValueError("Unsupported mode. Use 'ecb' or 'cfb'.")
+    chunk_size = stream.resolve_chunk_size(chunk_size)
+    if chunk_size < 8:
+        raise ValueError("chunk_size must be at least 8 bytes.")
+    round_keys = cipher._round_keys_for(key, op)
+    iv_bytes = None
+    if mode == "cfb":
+        with metrics.count_errors(op, "invalid_iv"):
+            if iv is None:
+                raise ValueError("IV is required for CFB mode.")
+            iv_bytes = cipher._parse_iv(iv)
+    return mode, round_keys, iv_bytes, chunk_size - chunk_size % 8
+
+
+async def encrypt_iter(
+    source: Source,
+    key: str,
+    mode: str = "ecb",
+    iv: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Encrypt plaintext bytes from source and yield raw ciphertext chunks.
+    ECB pads with PKCS#7 at the end; CFB needs iv (see encrypt_stream to auto-generate it).
+    """
+    mode, round_keys, prev, chunk_size = _prepare(key, mode, iv, "encrypt", chunk_size)
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    total = 0
+    pending = b""
+    async for piece in _read_pieces(source, chunk_size):
+        total += len(piece)
+        pending += piece
+        aligned = len(pending) - len(pending) % 8
+        if not aligned:
+            continue
+        blocks, pending = pending[:aligned], pending[aligned:]
+        if mode == "ecb":
+            out = await loop.run_in_executor(executor, cipher._ecb_encrypt_bytes, blocks, round_keys)
+        else:
+            out = await loop.run_in_executor(executor, cipher._cfb_encrypt_bytes, blocks, round_keys, prev)
+            prev = out[-8:]
+        yield out
+
+    if mode == "ecb":
+        yield await loop.run_in_executor(executor, cipher._ecb_encrypt_bytes, pkcs7_pad(pending, 8), round_keys)
+    elif pending:
+        yield await loop.run_in_executor(executor, cipher._cfb_encrypt_bytes, pending, round_keys, prev)
+    metrics.METRICS.record_operation("encrypt", mode, total, time.perf_counter() - start)
+
+
+async def decrypt_iter(
+    source: Source,
+    key: str,
+    mode: str = "ecb",
+    iv: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> AsyncIterator[bytes]:
+    """Decrypt raw ciphertext bytes from source and yield plaintext chunks (ECB padding removed)."""
+    mode, round_keys, prev, chunk_size = _prepare(key, mode, iv, "decrypt", chunk_size)
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    total = 0
+    pending = b""
+    held = b""  # ECB: last plaintext block, kept back for unpadding
+    async for piece in _read_pieces(source, chunk_size):
+        pending += piece
+        aligned = len(pending) - len(pending) % 8
+        if not aligned:
+            continue
+        blocks, pending = pending[:aligned], pending[aligned:]
+        if mode == "ecb":
+            plain = held + await loop.run_in_executor(executor, cipher._ecb_decrypt_bytes, blocks, round_keys)
+            plain, held = plain[:-8], plain[-8:]
+        else:
+            plain = await loop.run_in_executor(executor, cipher._cfb_decrypt_bytes, blocks, round_keys, prev)
+            prev = blocks[-8:]
+        if plain:
+            total += len(plain)
+            yield plain
+
+    if mode == "ecb":
+        if pending or not held:
+            metrics.METRICS.record_error("decrypt", "bad_length")
+            raise ValueError("Data length must be a multiple of block size.")
+        with metrics.count_errors("decrypt", "bad_padding"):
+            tail = pkcs7_unpad(held, 8)
+    else:
+        tail = cipher._cfb_decrypt_bytes(pending, round_keys, prev) if pending else b""
+    if tail:
+        total += len(tail)
+        yield tail
+    metrics.METRICS.record_operation("decrypt", mode, total, time.perf_counter() - start)
+
+
+async def _pump(chunks: AsyncIterator[bytes], writer: asyncio.StreamWriter):
+    """Write chunks to writer, waiting for the transport to drain after each one."""
+    async for chunk in chunks:
+        writer.write(chunk)
+        await writer.drain()
+
+
+async def encrypt_stream(
+    reader: Source,
+    writer: asyncio.StreamWriter,
+    key: str,
+    mode: str = "ecb",
+    iv: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> Optional[str]:
+    """
+    Encrypt everything from reader into writer (raw bytes).
+
+    Returns:
+        The IV as hex for CFB (generated when iv is None), None for ECB.
+    """
+    if mode.lower() == "cfb" and iv is None:
+        iv = os.urandom(8).hex()
+    await _pump(encrypt_iter(reader, key, mode, iv, chunk_size, executor), writer)
+    return cipher._parse_iv(iv).hex() if mode.lower() == "cfb" else None
+
+
+async def decrypt_stream(
+    reader: Source,
+    writer: asyncio.StreamWriter,
+    key: str,
+    mode: str = "ecb",
+    iv: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+    executor: Optional[Executor] = None,
+):
+    """Decrypt everything from reader into writer (raw bytes)."""
+    await _pump(decrypt_iter(reader, key, mode, iv, chunk_size, executor), writer)
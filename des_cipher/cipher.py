@@ -1,8 +1,13 @@
 """Core DES cipher logic with ECB and CFB modes."""
 
 import os
+import threading
+import time
+from collections import OrderedDict
 from typing import List, Optional, Tuple
 
+from . import compression, metrics
+
 # Initial Permutation (IP)
 IP_TABLE = [
     58, 50, 42, 34, 26, 18, 10, 2,
@@ -161,6 +166,51 @@ def _generate_round_keys(key_bytes: bytes) -> List[List[int]]:
     return round_keys
 
 
+# Small process-wide LRU cache of key schedules, so repeated calls with the same key
+# skip PC-1/PC-2. The saving is minor next to the 16 rounds per block; the cache is
+# mainly what the key_cache hit/miss metrics count. It keeps up to that many users'
+# key schedules in memory for the life of the process: clear it with
+# clear_key_cache(), or turn it off with set_key_cache_size(0).
+_ROUND_KEY_CACHE_SIZE = 32
+_round_key_cache: "OrderedDict[bytes, List[List[int]]]" = OrderedDict()
+_round_key_lock = threading.Lock()
+
+
+def clear_key_cache():
+    """Drop every cached key schedule."""
+    with _round_key_lock:
+        _round_key_cache.clear()
+
+
+def set_key_cache_size(size: int):
+    """Keep at most size key schedules (0 disables the cache); evicts the oldest extras now."""
+    global _ROUND_KEY_CACHE_SIZE
+    if size < 0:
+        raise ValueError("Key cache size must be 0 or more.")
+    with _round_key_lock:
+        _ROUND_KEY_CACHE_SIZE = size
+        while len(_round_key_cache) > size:
+            _round_key_cache.popitem(last=False)
+
+
+def _round_keys_for(key: str, op: str) -> List[List[int]]:
+    """Normalize the user key and return its round keys, served from the cache when possible."""
+    with metrics.count_errors(op, "invalid_key"):
+        key_bytes = normalize_des_key(key)
+    with _round_key_lock:
+        round_keys = _round_key_cache.get(key_bytes)
+        if round_keys is not None:
+            _round_key_cache.move_to_end(key_bytes)
+    metrics.METRICS.record_key_cache(hit=round_keys is not None)
+    if round_keys is None:
+        round_keys = _generate_round_keys(key_bytes)
+        with _round_key_lock:
+            _round_key_cache[key_bytes] = round_keys
+            while len(_round_key_cache) > _ROUND_KEY_CACHE_SIZE:
+                _round_key_cache.popitem(last=False)
+    return round_keys
+
+
 def _sbox_substitution(bits48: List[int]) -> List[int]:
     """Apply 8 S-boxes to 48-bit input -> 32-bit output."""
     out = []
@@ -214,7 +264,87 @@ def _parse_iv(iv: str) -> bytes:
     return iv_bytes
 
 
-def des_encrypt(plaintext: str, key: str, mode: str = "ecb", iv: Optional[str] = None) -> Tuple[str, Optional[str]]:
+def _ecb_encrypt_bytes(data: bytes, round_keys: List[List[int]]) -> bytes:
+    """ECB-encrypt block-aligned (already padded) data."""
+    out = bytearray()
+    for block in chunk_blocks(data, 8):
+        out.extend(_des_block(block, round_keys, encrypt=True))
+    return bytes(out)
+
+
+def _ecb_decrypt_bytes(data: bytes, round_keys: List[List[int]]) -> bytes:
+    """ECB-decrypt block-aligned data; padding is left for the caller to strip."""
+    out = bytearray()
+    for block in chunk_blocks(data, 8):
+        out.extend(_des_block(block, round_keys, encrypt=False))
+    return bytes(out)
+
+
+def _cfb_encrypt_bytes(data: bytes, round_keys: List[List[int]], iv_bytes: bytes) -> bytes:
+    """
+    CFB-encrypt data of any length starting from iv_bytes (no padding).
+    Only the last chunk of a message may end on a partial block; when data is
+    block-aligned, its last 8 cipher bytes are the IV for the next chunk.
+    """
+    out = bytearray()
+    prev = iv_bytes
+    # process full 8-byte blocks
+    full_len = len(data) - (len(data) % 8)
+    for i in range(0, full_len, 8):
+        block = data[i:i + 8]
+        keystream = _des_block(prev, round_keys, encrypt=True)
+        cipher_block = _xor_bytes(block, keystream)
+        out.extend(cipher_block)
+        prev = cipher_block
+    # process tail (if any) without padding
+    if len(data) % 8:
+        tail = data[full_len:]
+        keystream = _des_block(prev, round_keys, encrypt=True)
+        out.extend(_xor_bytes(tail, keystream[: len(tail)]))
+    return bytes(out)
+
+
+def _cfb_decrypt_bytes(data: bytes, round_keys: List[List[int]], iv_bytes: bytes) -> bytes:
+    """CFB-decrypt data of any length starting from iv_bytes (see _cfb_encrypt_bytes)."""
+    out = bytearray()
+    prev = iv_bytes
+    full_len = len(data) - (len(data) % 8)
+    for i in range(0, full_len, 8):
+        block = data[i:i + 8]
+        keystream = _des_block(prev, round_keys, encrypt=True)
+        out.extend(_xor_bytes(block, keystream))
+        prev = block
+    if len(data) % 8:
+        tail = data[full_len:]
+        keystream = _des_block(prev, round_keys, encrypt=True)
+        out.extend(_xor_bytes(tail, keystream[: len(tail)]))
+    return bytes(out)
+
+
+def _encode_plaintext(plaintext: str, compress: Optional[str]) -> Tuple[bytes, int]:
+    """UTF-8 encode plaintext and optionally compress it; returns (payload, raw length)."""
+    raw = utf8_to_bytes(plaintext)
+    if compress is None:
+        return raw, len(raw)
+    with metrics.count_errors("encrypt", "unsupported_compression"):
+        return compression.frame(raw, compress), len(raw)
+
+
+def _decode_plaintext(payload: bytes) -> Tuple[str, int]:
+    """Undo the optional compression frame and decode UTF-8; returns (text, plaintext byte count)."""
+    with metrics.count_errors("decrypt", "bad_compressed"):
+        raw = compression.unframe(payload)
+    with metrics.count_errors("decrypt", "invalid_utf8"):
+        return raw.decode("utf-8"), len(raw)
+
+
+def des_encrypt(
+    plaintext: str,
+    key: str,
+    mode: str = "ecb",
+    iv: Optional[str] = None,
+    compress: Optional[str] = None,
+) -> Tuple[str, Optional[str]]:
     """
     Encrypt plaintext with DES.
 
@@ -223,43 +353,36 @@ def des_encrypt(plaintext: str, key: str, mode: str = "ecb", iv: Optional[str] =
         key: User key (16-hex or 8-char), parity adjusted to DES requirements.
         mode: "ecb" (PKCS#7 padded) or "cfb" (no padding).
         iv: Required for CFB; 16-hex or 8-char string.
+        compress: Optional "zlib" or "lzma" stage run before padding/encryption,
+            so fewer blocks go through DES. It is recorded in the encrypted
+            payload and des_decrypt undoes it automatically; it is skipped
+            when it would not shrink the data.
+            Warning: ciphertext length then depends on the content (CRIME-style
+            leak); do not use it when attacker-influenced data is mixed with secrets.
 
     Returns:
         (cipher_hex, iv_hex) where iv_hex is None for ECB.
     """
+    start = time.perf_counter()
     mode = mode.lower()
-    key_bytes = normalize_des_key(key)
-    round_keys = _generate_round_keys(key_bytes)
+    round_keys = _round_keys_for(key, "encrypt")
 
     if mode == "ecb":
-        data = pkcs7_pad(utf8_to_bytes(plaintext), 8)
-        out = bytearray()
-        for block in chunk_blocks(data, 8):
-            out.extend(_des_block(block, round_keys, encrypt=True))
+        payload, raw_len = _encode_plaintext(plaintext, compress)
+        data = pkcs7_pad(payload, 8)
+        out = _ecb_encrypt_bytes(data, round_keys)
+        metrics.METRICS.record_operation("encrypt", mode, raw_len, time.perf_counter() - start)
         return out.hex(), None
 
     if mode == "cfb":
-        iv_bytes = _parse_iv(iv) if iv is not None else os.urandom(8)
-        data = utf8_to_bytes(plaintext)
-        out = bytearray()
-        prev = iv_bytes
-        # process full 8-byte blocks
-        full_len = len(data) - (len(data) % 8)
-        for i in range(0, full_len, 8):
-            block = data[i:i + 8]
-            keystream = _des_block(prev, round_keys, encrypt=True)
-            cipher_block = _xor_bytes(block, keystream)
-            out.extend(cipher_block)
-            prev = cipher_block
-        # process tail (if any) without padding
-        if len(data) % 8:
-            tail = data[full_len:]
-            keystream = _des_block(prev, round_keys, encrypt=True)
-            cipher_tail = _xor_bytes(tail, keystream[: len(tail)])
-            out.extend(cipher_tail)
-            prev = prev  # prev not used further
+        with metrics.count_errors("encrypt", "invalid_iv"):
+            iv_bytes = _parse_iv(iv) if iv is not None else os.urandom(8)
+        data, raw_len = _encode_plaintext(plaintext, compress)
+        out = _cfb_encrypt_bytes(data, round_keys, iv_bytes)
+        metrics.METRICS.record_operation("encrypt", mode, raw_len, time.perf_counter() - start)
         return out.hex(), iv_bytes.hex()
 
+    metrics.METRICS.record_error("encrypt", "unsupported_mode")
     raise ValueError("Unsupported mode. Use 'ecb' or 'cfb'.")
 
 
@@ -274,41 +397,35 @@ def des_decrypt(ciphertext: str, key: str, mode: str = "ecb", iv: Optional[str]
         iv: Required for CFB; 16-hex or 8-char string.
 
     Returns:
-        Decrypted plaintext as UTF-8 string.
+        Decrypted plaintext as UTF-8 string (decompressed if it was encrypted with compress=...).
     """
+    start = time.perf_counter()
     mode = mode.lower()
-    key_bytes = normalize_des_key(key)
-    round_keys = _generate_round_keys(key_bytes)
+    round_keys = _round_keys_for(key, "decrypt")
     try:
         data = bytes.fromhex(ciphertext.strip())
     except ValueError:
+        metrics.METRICS.record_error("decrypt", "invalid_hex")
         raise ValueError("Ciphertext must be a valid hex string.")
 
     if mode == "ecb":
-        out = bytearray()
-        for block in chunk_blocks(data, 8):
-            out.extend(_des_block(block, round_keys, encrypt=False))
-        unpadded = pkcs7_unpad(bytes(out), 8)
-        return unpadded.decode("utf-8")
+        with metrics.count_errors("decrypt", "bad_length"):
+            out = _ecb_decrypt_bytes(data, round_keys)
+        with metrics.count_errors("decrypt", "bad_padding"):
+            unpadded = pkcs7_unpad(out, 8)
+        text, raw_len = _decode_plaintext(unpadded)
+        metrics.METRICS.record_operation("decrypt", mode, raw_len, time.perf_counter() - start)
+        return text
 
     if mode == "cfb":
-        if iv is None:
-            raise ValueError("IV is required for CFB mode.")
-        iv_bytes = _parse_iv(iv)
-        out = bytearray()
-        prev = iv_bytes
-        full_len = len(data) - (len(data) % 8)
-        for i in range(0, full_len, 8):
-            block = data[i:i + 8]
-            keystream = _des_block(prev, round_keys, encrypt=True)
-            plain_block = _xor_bytes(block, keystream)
-            out.extend(plain_block)
-            prev = block
-        if len(data) % 8:
-            tail = data[full_len:]
-            keystream = _des_block(prev, round_keys, encrypt=True)
-            plain_tail = _xor_bytes(tail, keystream[: len(tail)])
-            out.extend(plain_tail)
-        return bytes(out).decode("utf-8")
-
+        with metrics.count_errors("decrypt", "invalid_iv"):
+            if iv is None:
+                raise ValueError("IV is required for CFB mode.")
+            iv_bytes = _parse_iv(iv)
+        out = _cfb_decrypt_bytes(data, round_keys, iv_bytes)
+        text, raw_len = _decode_plaintext(out)
+        metrics.METRICS.record_operation("decrypt", mode, raw_len, time.perf_counter() - start)
+        return text
+
+    metrics.METRICS.record_error("decrypt", "unsupported_mode")
     raise ValueError("Unsupported mode. Use 'ecb' or 'cfb'.")
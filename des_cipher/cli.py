@@ -3,10 +3,11 @@
 Command-line entry point for the DES Cipher application.
 """
 
+import argparse
 import sys
 import time
 
-from . import ui, workflows
+from . import tune, ui, workflows
 
 
 def main_loop():
@@ -17,19 +18,22 @@ def main_loop():
         menu = (
             "1) Mã hóa (Encrypt)\n"
             "2) Giải mã (Decrypt)\n"
-            "3) Help\n"
-            "4) Exit\n"
+            "3) File lớn (CFB phân đoạn)\n"
+            "4) Help\n"
+            "5) Exit\n"
         )
         ui.boxed("MAIN MENU", menu)
-        choice = ui.prompt("Chọn (1-4): ").strip()
+        choice = ui.prompt("Chọn (1-5): ").strip()
 
         if choice == "1":
             workflows.encrypt_flow()
         elif choice == "2":
             workflows.decrypt_flow()
         elif choice == "3":
-            workflows.show_help()
+            workflows.segmented_file_flow()
         elif choice == "4":
+            workflows.show_help()
+        elif choice == "5":
             print(ui.FG["magenta"] + "Tạm biệt — mã hóa an toàn nhé!" + ui.RESET)
             time.sleep(0.6)
             break
@@ -38,8 +42,32 @@ def main_loop():
             time.sleep(0.8)
 
 
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parses command-line arguments; without a command the interactive menu runs."""
+    parser = argparse.ArgumentParser(prog="des", description="DES Cipher CLI (ECB/CFB).")
+    parser.add_argument(
+        "--no-tune",
+        action="store_true",
+        help="bỏ qua profile đã tune, dùng cấu hình mặc định (kết quả tái lập được)",
+    )
+    sub = parser.add_subparsers(dest="command")
+    tune_parser = sub.add_parser("tune", help="đo thông lượng và lưu cấu hình nhanh nhất cho máy này")
+    tune_parser.add_argument(
+        "--sample-size",
+        type=int,
+        default=32 * 1024,
+        help="số byte dùng cho mỗi lần đo (mặc định 32768)",
+    )
+    return parser.parse_args(argv)
+
+
 def main():
     """Main function to run the application."""
+    args = parse_args()
+    if args.no_tune:
+        tune.disable()
+    if args.command == "tune":
+        sys.exit(tune.run_tune(args.sample_size))
     try:
         main_loop()
     except KeyboardInterrupt:
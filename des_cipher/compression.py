@@ -0,0 +1,146 @@
+"""
+Optional compression stage applied before padding/encryption and after decryption.
+
+A compressed payload is framed as 0xFF | algorithm id | compressed stream.
+Plaintexts are UTF-8, where 0xFF never occurs, so the decrypt side can tell a
+framed payload from plain text without any out-of-band flag.
+"""
+
+import lzma
+import zlib
+from typing import Iterator, Optional
+
+MARKER = 0xFF
+ALGORITHMS = {"zlib": ord("z"), "lzma": ord("x")}
+_NAMES = {v: k for k, v in ALGORITHMS.items()}
+
+
+def _check_name(name: str) -> str:
+    name = name.lower()
+    if name not in ALGORITHMS:
+        raise ValueError("Unsupported compression. Use 'zlib' or 'lzma'.")
+    return name
+
+
+# LZMA dictionary kept small (zlib uses a 32 KiB window) so the decoder's memory is a
+# small constant; the decoder refuses frames that would need more than LZMA_MEMLIMIT.
+LZMA_DICT_SIZE = 64 * 1024
+LZMA_MEMLIMIT = 1024 * 1024
+
+
+def _compressor(name: str):
+    if name == "zlib":
+        return zlib.compressobj(9)
+    filters = [{"id": lzma.FILTER_LZMA2, "preset": 6, "dict_size": LZMA_DICT_SIZE}]
+    return lzma.LZMACompressor(format=lzma.FORMAT_XZ, filters=filters)
+
+
+def _decompressor(name: str):
+    if name == "zlib":
+        return zlib.decompressobj()
+    return lzma.LZMADecompressor(format=lzma.FORMAT_XZ, memlimit=LZMA_MEMLIMIT)
+
+
+class Framer:
+    """Streaming compressor that emits the frame header followed by compressed data."""
+
+    def __init__(self, name: str):
+        self.name = _check_name(name)
+        self._comp = _compressor(self.name)
+        self._header = bytes([MARKER, ALGORITHMS[self.name]])
+
+    def _take_header(self) -> bytes:
+        header, self._header = self._header, b""
+        return header
+
+    def compress(self, data: bytes) -> bytes:
+        return self._take_header() + self._comp.compress(data)
+
+    def flush(self) -> bytes:
+        return self._take_header() + self._comp.flush()
+
+
+def frame(data: bytes, name: str) -> bytes:
+    """Compress data into a frame; falls back to the raw data when compression does not help."""
+    framer = Framer(name)
+    framed = framer.compress(data) + framer.flush()
+    return framed if len(framed) < len(data) else data
+
+
+class Unframer:
+    """
+    Streaming counterpart of Framer: feed decrypted bytes, get plaintext bytes.
+    Unframed (plain UTF-8) input is passed through unchanged.
+
+    Decompression runs in steps of at most max_output bytes (None: unbounded),
+    so a highly compressed chunk or a decompression bomb cannot blow up memory.
+    """
+
+    def __init__(self, max_output: Optional[int] = None):
+        self.name: Optional[str] = None
+        self.max_output = max_output
+        self._decomp = None
+        self._head = b""
+        self._plain = False
+
+    def feed(self, data: bytes, final: bool = False) -> Iterator[bytes]:
+        """Yield plaintext pieces for data; with final=True also check the stream is complete."""
+        if not self._plain and self._decomp is None:
+            self._head += data
+            data = b""
+            if self._head and self._head[0] != MARKER:
+                self._plain = True
+                data, self._head = self._head, b""
+            elif len(self._head) >= 2:
+                if self._head[1] not in _NAMES:
+                    raise ValueError("Unknown compression in payload.")
+                self.name = _NAMES[self._head[1]]
+                self._decomp = _decompressor(self.name)
+                data, self._head = self._head[2:], b""
+        if self._plain:
+            if data:
+                yield data
+        elif self._decomp is not None:
+            # Past the end of the stream lzma raises EOFError and zlib would buffer
+            # the rest in unused_data; reject it as soon as it arrives.
+            if data and self._decomp.eof:
+                raise ValueError("Trailing data after compressed payload.")
+            try:
+                yield from self._inflate(data)
+            except (zlib.error, lzma.LZMAError):
+                raise ValueError("Corrupt compressed payload.")
+        if final:
+            self._finish()
+
+    def _inflate(self, data: bytes) -> Iterator[bytes]:
+        limit = self.max_output
+        if self.name == "zlib":
+            while True:
+                out = self._decomp.decompress(data, limit or 0)
+                if out:
+                    yield out
+                data = self._decomp.unconsumed_tail
+                # A full output buffer may leave more output pending inside zlib.
+                if not data and not (limit and len(out) == limit):
+                    return
+        else:
+            out = self._decomp.decompress(data, limit or -1)
+            if out:
+                yield out
+            while not self._decomp.eof and not self._decomp.needs_input:
+                out = self._decomp.decompress(b"", limit or -1)
+                if out:
+                    yield out
+
+    def _finish(self):
+        if self._plain or (self._decomp is None and not self._head):
+            return
+        if self._decomp is None or not self._decomp.eof:
+            raise ValueError("Truncated compressed payload.")
+        if self._decomp.unused_data:
+            raise ValueError("Trailing data after compressed payload.")
+
+
+def unframe(data: bytes) -> bytes:
+    """Undo frame(); data that is not framed is returned as is."""
+    return b"".join(Unframer().feed(data, final=True))
@@ -0,0 +1,213 @@
+"""
+In-process operational metrics for the DES encrypt/decrypt paths.
+
+Counters and histograms are plain dicts guarded by one lock, so recording an
+operation costs a few dictionary updates and stays cheap enough to leave on.
+Read them with snapshot(), or dump them with to_json() / to_prometheus().
+Byte counts and size buckets always refer to plaintext bytes (before compression
+and padding), for encryption and decryption alike, so the two are comparable.
+"""
+
+import json
+import os
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+# Upper bounds (plaintext bytes) of the payload-size buckets; larger payloads fall into "+Inf".
+SIZE_BUCKETS: Tuple[int, ...] = (64, 1024, 16 * 1024, 256 * 1024, 4 * 1024 * 1024)
+
+# Upper bounds (seconds) of the latency histogram buckets.
+LATENCY_BUCKETS: Tuple[float, ...] = (0.001, 0.005, 0.025, 0.1, 0.5, 2.5, 10.0, 60.0)
+
+
+def _size_label(nbytes: int) -> str:
+    """Return the label of the payload-size bucket nbytes falls into."""
+    i = bisect_left(SIZE_BUCKETS, nbytes)
+    return str(SIZE_BUCKETS[i]) if i < len(SIZE_BUCKETS) else "+Inf"
+
+
+class Metrics:
+    """Thread-safe registry of DES operation counters and latency histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Drop everything recorded so far."""
+        with self._lock:
+            self._ops: Dict[Tuple[str, str], int] = {}
+            self._bytes: Dict[Tuple[str, str], int] = {}
+            self._errors: Dict[Tuple[str, str], int] = {}
+            self._cache = {"hit": 0, "miss": 0}
+            # (op, mode, size bucket) -> [per-bucket counts..., +Inf count, sum of seconds]
+            self._latency: Dict[Tuple[str, str, str], list] = {}
+
+    def record_operation(self, op: str, mode: str, nbytes: int, seconds: float):
+        """Count one successful operation on nbytes of plaintext that took seconds."""
+        key = (op, mode)
+        hist_key = (op, mode, _size_label(nbytes))
+        slot = bisect_left(LATENCY_BUCKETS, seconds)
+        with self._lock:
+            self._ops[key] = self._ops.get(key, 0) + 1
+            self._bytes[key] = self._bytes.get(key, 0) + nbytes
+            hist = self._latency.get(hist_key)
+            if hist is None:
+                hist = self._latency[hist_key] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0]
+            hist[slot] += 1
+            hist[-1] += seconds
+
+    def record_error(self, op: str, kind: str):
+        """Count one failed operation of the given error kind (e.g. 'bad_padding')."""
+        key = (op, kind)
+        with self._lock:
+            self._errors[key] = self._errors.get(key, 0) + 1
+
+    def record_key_cache(self, hit: bool):
+        """Count one lookup in the round-key cache."""
+        with self._lock:
+            self._cache["hit" if hit else "miss"] += 1
+
+    def snapshot(self) -> dict:
+        """
+        Return a JSON-serialisable copy of all metrics.
+
+        Histogram buckets are cumulative, as in Prometheus: each "le" entry counts
+        the operations that finished within that many seconds.
+        """
+        with self._lock:
+            ops = dict(self._ops)
+            nbytes = dict(self._bytes)
+            errors = dict(self._errors)
+            cache = dict(self._cache)
+            latency = {k: list(v) for k, v in self._latency.items()}
+
+        histograms = []
+        for (op, mode, size), hist in sorted(latency.items()):
+            cumulative = []
+            running = 0
+            for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), hist[:-1]):
+                running += count
+                cumulative.append({"le": "+Inf" if bound == float("inf") else bound, "count": running})
+            histograms.append({
+                "op": op,
+                "mode": mode,
+                "size_le": size,
+                "buckets": cumulative,
+                "count": running,
+                "sum": hist[-1],
+            })
+
+        return {
+            "operations": [
+                {"op": op, "mode": mode, "count": count, "bytes": nbytes.get((op, mode), 0)}
+                for (op, mode), count in sorted(ops.items())
+            ],
+            "errors": [
+                {"op": op, "kind": kind, "count": count}
+                for (op, kind), count in sorted(errors.items())
+            ],
+            "key_cache": cache,
+            "latency": histograms,
+        }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        """Dump the snapshot as a JSON document."""
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self) -> str:
+        """Dump the snapshot in the Prometheus text exposition format."""
+        snap = self.snapshot()
+        lines = [
+            "# HELP des_operations_total Completed DES operations.",
+            "# TYPE des_operations_total counter",
+        ]
+        for row in snap["operations"]:
+            lines.append(f'des_operations_total{{op="{row["op"]}",mode="{row["mode"]}"}} {row["count"]}')
+        lines += [
+            "# HELP des_bytes_total Plaintext bytes processed by completed DES operations.",
+            "# TYPE des_bytes_total counter",
+        ]
+        for row in snap["operations"]:
+            lines.append(f'des_bytes_total{{op="{row["op"]}",mode="{row["mode"]}"}} {row["bytes"]}')
+        lines += [
+            "# HELP des_errors_total Failed DES operations by error kind.",
+            "# TYPE des_errors_total counter",
+        ]
+        for row in snap["errors"]:
+            lines.append(f'des_errors_total{{op="{row["op"]}",kind="{row["kind"]}"}} {row["count"]}')
+        lines += [
+            "# HELP des_key_cache_lookups_total Round-key cache lookups.",
+            "# TYPE des_key_cache_lookups_total counter",
+        ]
+        for result in ("hit", "miss"):
+            lines.append(f'des_key_cache_lookups_total{{result="{result}"}} {snap["key_cache"][result]}')
+        lines += [
+            "# HELP des_operation_duration_seconds DES operation latency by plaintext size bucket.",
+            "# TYPE des_operation_duration_seconds histogram",
+        ]
+        for hist in snap["latency"]:
+            labels = f'op="{hist["op"]}",mode="{hist["mode"]}",size_le="{hist["size_le"]}"'
+            for bucket in hist["buckets"]:
+                lines.append(f'des_operation_duration_seconds_bucket{{{labels},le="{bucket["le"]}"}} {bucket["count"]}')
+            lines.append(f"des_operation_duration_seconds_sum{{{labels}}} {hist['sum']}")
+            lines.append(f"des_operation_duration_seconds_count{{{labels}}} {hist['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str, fmt: str = "prometheus"):
+        """
+        Write the metrics to path as "prometheus" (textfile collector) or "json".
+        The file is replaced atomically so collectors never read a partial dump.
+        """
+        fmt = fmt.lower()
+        if fmt == "prometheus":
+            content = self.to_prometheus()
+        elif fmt == "json":
+            content = self.to_json()
+        else:
+            raise ValueError("Unsupported metrics format. Use 'prometheus' or 'json'.")
+        tmp_path = f"{path}.tmp.{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+
+# Process-wide registry used by the cipher module.
+METRICS = Metrics()
+
+
+@contextmanager
+def count_errors(op: str, kind: str) -> Iterator[None]:
+    """Record a METRICS error of the given kind when the block raises ValueError."""
+    try:
+        yield
+    except ValueError:
+        METRICS.record_error(op, kind)
+        raise
+
+
+def snapshot() -> dict:
+    """Return a copy of the process-wide metrics."""
+    return METRICS.snapshot()
+
+
+def to_json(indent: Optional[int] = 2) -> str:
+    """Dump the process-wide metrics as JSON."""
+    return METRICS.to_json(indent)
+
+
+def to_prometheus() -> str:
+    """Dump the process-wide metrics in the Prometheus text format."""
+    return METRICS.to_prometheus()
+
+
+def write(path: str, fmt: str = "prometheus"):
+    """Write the process-wide metrics to path (see Metrics.write)."""
+    METRICS.write(path, fmt)
+
+
+def reset():
+    """Clear the process-wide metrics."""
+    METRICS.reset()
@@ -0,0 +1,245 @@
+"""
+Segmented CFB container for large files.
+
+The plaintext is split into fixed-size segments and every segment is encrypted
+with DES-CFB under its own IV, derived from the base IV, the segment index and
+the segment's generation. Segments do not depend on each other, so they can be
+encrypted/decrypted in parallel, read on their own, and re-encrypted one at a
+time; every re-encryption bumps the generation so no IV (and thus no CFB
+keystream) is ever reused.
+
+Layout (big-endian):
+    header   magic "DESCFBS2" | base IV (8) | segment_size (u32) | segment_count (u32) | plaintext length (u64)
+    index    segment_count x (offset (u64), length (u32), generation (u32))
+    data     ciphertext of each segment (CFB keeps the plaintext length)
+"""
+
+import os
+import struct
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from . import cipher, metrics, tune
+
+MAGIC = b"DESCFBS2"
+DEFAULT_SEGMENT_SIZE = 1 << 20  # 1 MiB
+
+_HEADER = struct.Struct(">8s8sIIQ")
+_INDEX_ENTRY = struct.Struct(">QII")
+_MAX_GENERATION = 0xFFFFFFFF
+_MAX_SEGMENTS = 0xFFFFFFFF  # segment_count is a u32
+
+
+class SegmentedHeader(NamedTuple):
+    """Parsed container header and segment index."""
+    iv: bytes
+    segment_size: int
+    segment_count: int
+    total_length: int
+    index: List[Tuple[int, int, int]]  # (offset, length, generation) of each segment
+
+
+def derive_segment_iv(round_keys: List[List[int]], base_iv: bytes, index: int, generation: int = 0) -> bytes:
+    """
+    IV of segment `index` at `generation`: DES_K(base_iv XOR (index || generation)),
+    unique per (index, generation) and unpredictable without the key.
+    """
+    counter = index.to_bytes(4, "big") + generation.to_bytes(4, "big")
+    return cipher._des_block(cipher._xor_bytes(base_iv, counter), round_keys, encrypt=True)
+
+
+def _encrypt_segment(args: Tuple[List[List[int]], bytes, int, int, bytes]) -> bytes:
+    """Worker: encrypt one segment (top-level so process pools can pickle it)."""
+    round_keys, base_iv, index, generation, data = args
+    iv = derive_segment_iv(round_keys, base_iv, index, generation)
+    return cipher._cfb_encrypt_bytes(data, round_keys, iv)
+
+
+def _decrypt_segment(args: Tuple[List[List[int]], bytes, int, int, bytes]) -> bytes:
+    """Worker: decrypt one segment."""
+    round_keys, base_iv, index, generation, data = args
+    iv = derive_segment_iv(round_keys, base_iv, index, generation)
+    return cipher._cfb_decrypt_bytes(data, round_keys, iv)
+
+
+def _ordered_map(func: Callable, jobs: Iterable, workers: Optional[int]) -> Iterator:
+    """
+    Map func over jobs and yield results in order.
+    At most 2 * workers jobs are in flight, so a huge file is never read into memory at once.
+    workers=1 runs serially in-process; None uses the tuned value or all CPUs.
+    """
+    workers = workers or tune.get("workers", None) or os.cpu_count() or 1
+    if workers == 1:
+        for job in jobs:
+            yield func(job)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for job in jobs:
+            pending.append(executor.submit(func, job))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _segment_count(segment_size: int, total_length: int) -> int:
+    return -(-total_length // segment_size)
+
+
+def _layout(segment_size: int, total_length: int) -> List[Tuple[int, int]]:
+    """Compute the (offset, length) index for a plaintext of total_length bytes."""
+    count = _segment_count(segment_size, total_length)
+    data_start = _HEADER.size + count * _INDEX_ENTRY.size
+    return [
+        (data_start + i * segment_size, min(segment_size, total_length - i * segment_size))
+        for i in range(count)
+    ]
+
+
+def _read_header(f: BinaryIO) -> SegmentedHeader:
+    """Parse and validate the header and index at the start of f."""
+    raw = f.read(_HEADER.size)
+    if len(raw) != _HEADER.size:
+        raise ValueError("Not a segmented DES container (file too short).")
+    magic, iv, segment_size, count, total = _HEADER.unpack(raw)
+    if magic != MAGIC:
+        raise ValueError("Not a segmented DES container (bad magic).")
+    if segment_size <= 0 or segment_size % 8:
+        raise ValueError("Segmented DES container has an invalid segment size.")
+    # Checked before anything is sized from the header, so a forged total cannot
+    # make us build a huge layout.
+    if count != _segment_count(segment_size, total):
+        raise ValueError("Segmented DES container segment count does not match its length.")
+    raw_index = f.read(count * _INDEX_ENTRY.size)
+    if len(raw_index) != count * _INDEX_ENTRY.size:
+        raise ValueError("Segmented DES container index is truncated.")
+    index = list(_INDEX_ENTRY.iter_unpack(raw_index))
+    # Offsets and lengths are fully determined by the header; never trust others.
+    if [(offset, length) for offset, length, _ in index] != _layout(segment_size, total):
+        raise ValueError("Segmented DES container index does not match its header.")
+    return SegmentedHeader(iv, segment_size, count, total, index)
+
+
+def read_header(path: str) -> SegmentedHeader:
+    """Read the header and segment index of a container file."""
+    with open(path, "rb") as f:
+        return _read_header(f)
+
+
+def encrypt_file(
+    src: str,
+    dst: str,
+    key: str,
+    iv: Optional[str] = None,
+    segment_size: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> str:
+    """
+    Encrypt the file src into a segmented CFB container at dst.
+
+    Args:
+        key: User key (16-hex or 8-char).
+        iv: Base IV (16-hex or 8-char); random when omitted.
+        segment_size: Plaintext bytes per segment (multiple of 8); None uses DEFAULT_SEGMENT_SIZE.
+        workers: Worker processes; None uses the tuned value or all CPUs, 1 runs serially.
+
+    Returns:
+        The base IV as hex (also stored in the container header).
+    """
+    if segment_size is None:
+        segment_size = DEFAULT_SEGMENT_SIZE
+    if segment_size <= 0 or segment_size % 8 or segment_size > 0xFFFFFFFF:
+        raise ValueError("segment_size must be a positive multiple of 8 that fits in 32 bits.")
+    start = time.perf_counter()
+    round_keys = cipher._round_keys_for(key, "encrypt")
+    with metrics.count_errors("encrypt", "invalid_iv"):
+        base_iv = cipher._parse_iv(iv) if iv is not None else os.urandom(8)
+
+    total = os.path.getsize(src)
+    if _segment_count(segment_size, total) > _MAX_SEGMENTS:
+        raise ValueError(f"File needs more than {_MAX_SEGMENTS} segments; use a larger segment_size.")
+    index = _layout(segment_size, total)
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        fout.write(_HEADER.pack(MAGIC, base_iv, segment_size, len(index), total))
+        for offset, length in index:
+            fout.write(_INDEX_ENTRY.pack(offset, length, 0))
+        jobs = ((round_keys, base_iv, i, 0, fin.read(segment_size)) for i in range(len(index)))
+        for segment in _ordered_map(_encrypt_segment, jobs, workers):
+            fout.write(segment)
+    metrics.METRICS.record_operation("encrypt", "cfb-segmented", total, time.perf_counter() - start)
+    return base_iv.hex()
+
+
+def decrypt_file(src: str, dst: str, key: str, workers: Optional[int] = None):
+    """Decrypt the segmented container src into the plain file dst."""
+    start = time.perf_counter()
+    round_keys = cipher._round_keys_for(key, "decrypt")
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        with metrics.count_errors("decrypt", "bad_container"):
+            header = _read_header(fin)
+
+        def jobs():
+            for i, (offset, length, generation) in enumerate(header.index):
+                fin.seek(offset)
+                data = fin.read(length)
+                if len(data) != length:
+                    metrics.METRICS.record_error("decrypt", "bad_container")
+                    raise ValueError(f"Segment {i} is truncated.")
+                yield round_keys, header.iv, i, generation, data
+
+        for segment in _ordered_map(_decrypt_segment, jobs(), workers):
+            fout.write(segment)
+    metrics.METRICS.record_operation("decrypt", "cfb-segmented", header.total_length, time.perf_counter() - start)
+
+
+def read_segment(path: str, key: str, index: int) -> bytes:
+    """Decrypt and return only segment `index` of the container."""
+    round_keys = cipher._round_keys_for(key, "decrypt")
+    with open(path, "rb") as f:
+        with metrics.count_errors("decrypt", "bad_container"):
+            header = _read_header(f)
+        if not 0 <= index < header.segment_count:
+            raise ValueError(f"Segment index out of range (0..{header.segment_count - 1}).")
+        offset, length, generation = header.index[index]
+        f.seek(offset)
+        data = f.read(length)
+    if len(data) != length:
+        metrics.METRICS.record_error("decrypt", "bad_container")
+        raise ValueError(f"Segment {index} is truncated.")
+    return _decrypt_segment((round_keys, header.iv, index, generation, data))
+
+
+def reencrypt_segment(path: str, key: str, index: int, plaintext: bytes):
+    """
+    Replace segment `index` in place with the encryption of plaintext.
+    The new plaintext must have the same length as the segment it replaces.
+    The segment's generation is bumped, so the new ciphertext uses a fresh IV.
+
+    Not crash-safe: the ciphertext is written and synced before the index entry,
+    but an interruption between the two writes leaves the segment decrypting to
+    garbage, and the container has no integrity check to detect it. Keep a copy
+    of the file when that matters.
+    """
+    round_keys = cipher._round_keys_for(key, "encrypt")
+    with open(path, "r+b") as f:
+        with metrics.count_errors("encrypt", "bad_container"):
+            header = _read_header(f)
+        if not 0 <= index < header.segment_count:
+            raise ValueError(f"Segment index out of range (0..{header.segment_count - 1}).")
+        offset, length, generation = header.index[index]
+        if len(plaintext) != length:
+            raise ValueError(f"Segment {index} holds {length} bytes; got {len(plaintext)}.")
+        if generation >= _MAX_GENERATION:
+            raise ValueError(f"Segment {index} cannot be re-encrypted again (generation limit reached).")
+        generation += 1
+        f.seek(offset)
+        f.write(_encrypt_segment((round_keys, header.iv, index, generation, plaintext)))
+        f.flush()
+        os.fsync(f.fileno())
+        f.seek(_HEADER.size + index * _INDEX_ENTRY.size)
+        f.write(_INDEX_ENTRY.pack(offset, length, generation))
+        f.flush()
+        os.fsync(f.fileno())
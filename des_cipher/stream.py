@@ -0,0 +1,179 @@
+"""
+Incremental DES decryption with bounded memory.
+
+des_decrypt() materialises the hex string, its bytes, the plaintext bytes and
+the decoded text all at once. StreamDecryptor instead consumes hex in pieces:
+hex is decoded chunk by chunk, PKCS#7 is checked on the final block only and
+UTF-8 is decoded incrementally, so the working set is a small multiple of
+chunk_size no matter how long the ciphertext is. Payloads encrypted with
+compression are decompressed on the fly, also in steps of at most chunk_size
+bytes, so highly compressible data keeps the same ceiling.
+"""
+
+import codecs
+import time
+from typing import Iterable, Iterator, Optional, Union
+
+from . import cipher, compression, metrics, tune
+from .helper import pkcs7_unpad
+
+DEFAULT_CHUNK_SIZE = 64 * 1024  # ciphertext bytes handled per step (unless tuned)
+
+
+def resolve_chunk_size(chunk_size: Optional[int]) -> int:
+    """
+    chunk_size as given, or the tuned value when None. A tuned profile may only
+    lower the chunk size (it is the memory ceiling), never raise it above the default.
+    """
+    if chunk_size is not None:
+        return chunk_size
+    return min(tune.get("chunk_size", DEFAULT_CHUNK_SIZE), DEFAULT_CHUNK_SIZE)
+
+
+class StreamDecryptor:
+    """
+    Decrypt hex ciphertext fed through update(); call finalize() once at the end.
+
+    Args:
+        key: User key (16-hex or 8-char).
+        mode: "ecb" (expects PKCS#7 padding) or "cfb".
+        iv: Required for CFB; 16-hex or 8-char string.
+        chunk_size: Memory ceiling knob: at most this many ciphertext bytes are
+            decoded, decrypted and converted to text per step. None uses the
+            machine's tuned value (see tune; capped at DEFAULT_CHUNK_SIZE) or
+            DEFAULT_CHUNK_SIZE, so pass it explicitly when the ceiling matters.
+    """
+
+    def __init__(self, key: str, mode: str = "ecb", iv: Optional[str] = None, chunk_size: Optional[int] = None):
+        mode = mode.lower()
+        chunk_size = resolve_chunk_size(chunk_size)
+        if mode not in ("ecb", "cfb"):
+            metrics.METRICS.record_error("decrypt", "unsupported_mode")
+            raise ValueError("Unsupported mode. Use 'ecb' or 'cfb'.")
+        if chunk_size < 8:
+            raise ValueError("chunk_size must be at least 8 bytes.")
+        self.mode = mode
+        self.chunk_size = chunk_size - chunk_size % 8
+        self._round_keys = cipher._round_keys_for(key, "decrypt")
+        self._prev = b""
+        if mode == "cfb":
+            with metrics.count_errors("decrypt", "invalid_iv"):
+                if iv is None:
+                    raise ValueError("IV is required for CFB mode.")
+                self._prev = cipher._parse_iv(iv)
+        self._hex_tail = ""  # odd hex digit left over from the previous piece
+        self._pending = b""  # ciphertext bytes not yet forming a full block
+        self._held = b""  # ECB: last decrypted block, kept back for unpadding
+        self._unframer = compression.Unframer(max_output=self.chunk_size)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._total = 0
+        self._start = time.perf_counter()
+
+    def update(self, hex_chunk: str) -> str:
+        """Feed more hex ciphertext (any length, whitespace allowed); return the text decrypted so far."""
+        return "".join(self.iter_update(hex_chunk))
+
+    def iter_update(self, hex_chunk: str) -> Iterator[str]:
+        """Like update(), but yield the text in pieces of at most chunk_size bytes."""
+        step = 2 * self.chunk_size
+        for i in range(0, len(hex_chunk), step):
+            yield from self._update_piece(hex_chunk[i:i + step])
+
+    def _update_piece(self, piece: str) -> Iterator[str]:
+        digits = self._hex_tail + "".join(piece.split())
+        cut = len(digits) - len(digits) % 2
+        self._hex_tail = digits[cut:]
+        try:
+            data = bytes.fromhex(digits[:cut])
+        except ValueError:
+            metrics.METRICS.record_error("decrypt", "invalid_hex")
+            raise ValueError("Ciphertext must be a valid hex string.")
+
+        data = self._pending + data
+        aligned = len(data) - len(data) % 8
+        self._pending = data[aligned:]
+        blocks = data[:aligned]
+        if not blocks:
+            return
+
+        if self.mode == "ecb":
+            plain = self._held + cipher._ecb_decrypt_bytes(blocks, self._round_keys)
+            plain, self._held = plain[:-8], plain[-8:]
+        else:
+            plain = cipher._cfb_decrypt_bytes(blocks, self._round_keys, self._prev)
+            self._prev = blocks[-8:]
+        yield from self._decode(plain, final=False)
+
+    def finalize(self) -> str:
+        """Flush the remaining text; validates padding (ECB) and the UTF-8 tail."""
+        return "".join(self.iter_finalize())
+
+    def iter_finalize(self) -> Iterator[str]:
+        """Like finalize(), but yield the text in pieces of at most chunk_size bytes."""
+        if self._hex_tail:
+            metrics.METRICS.record_error("decrypt", "invalid_hex")
+            raise ValueError("Ciphertext must be a valid hex string.")
+        if self.mode == "ecb":
+            if self._pending or not self._held:
+                metrics.METRICS.record_error("decrypt", "bad_length")
+                raise ValueError("Data length must be a multiple of block size.")
+            with metrics.count_errors("decrypt", "bad_padding"):
+                plain = pkcs7_unpad(self._held, 8)
+            self._held = b""
+        else:
+            plain = cipher._cfb_decrypt_bytes(self._pending, self._round_keys, self._prev)
+            self._pending = b""
+        yield from self._decode(plain, final=True)
+        metrics.METRICS.record_operation("decrypt", self.mode, self._total, time.perf_counter() - self._start)
+
+    def _decode(self, plain: bytes, final: bool) -> Iterator[str]:
+        raw_pieces = self._unframer.feed(plain, final)
+        while True:
+            with metrics.count_errors("decrypt", "bad_compressed"):
+                raw = next(raw_pieces, None)
+            if raw is None:
+                break
+            self._total += len(raw)
+            with metrics.count_errors("decrypt", "invalid_utf8"):
+                text = self._decoder.decode(raw)
+            if text:
+                yield text
+        if final:
+            with metrics.count_errors("decrypt", "invalid_utf8"):
+                text = self._decoder.decode(b"", True)
+            if text:
+                yield text
+
+
+def des_decrypt_stream(
+    ciphertext: Union[str, Iterable[str]],
+    key: str,
+    mode: str = "ecb",
+    iv: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+) -> Iterator[str]:
+    """
+    Decrypt hex ciphertext (one string or an iterable of hex pieces) and yield text pieces.
+    Same result as "".join(...) of des_decrypt(), with memory bounded by chunk_size.
+    """
+    dec = StreamDecryptor(key, mode=mode, iv=iv, chunk_size=chunk_size)
+    pieces = [ciphertext] if isinstance(ciphertext, str) else ciphertext
+    for piece in pieces:
+        yield from dec.iter_update(piece)
+    yield from dec.iter_finalize()
+
+
+def decrypt_hex_file(
+    src: str,
+    dst: str,
+    key: str,
+    mode: str = "ecb",
+    iv: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+):
+    """Decrypt a file holding hex ciphertext into a UTF-8 text file, chunk_size bytes at a time."""
+    chunk_size = resolve_chunk_size(chunk_size)
+    with open(src, "r", encoding="ascii") as fin, open(dst, "w", encoding="utf-8", newline="") as fout:
+        pieces = iter(lambda: fin.read(2 * chunk_size), "")
+        for text in des_decrypt_stream(pieces, key, mode=mode, iv=iv, chunk_size=chunk_size):
+            fout.write(text)
@@ -0,0 +1,221 @@
+"""
+Throughput autotuner with a per-machine cached profile.
+
+`des tune` times short encrypt/decrypt runs for a few candidate settings and
+saves the fastest ones to tune.json under the user's config directory, keyed by
+machine so a shared home directory can hold several hosts. Two settings are
+tuned: the worker count of segmented and the chunk_size of stream; both modules
+pick them up through get() whenever a caller leaves them unset.
+Pass --no-tune (or set DES_NO_TUNE=1) to ignore the profile for reproducible runs.
+
+Each candidate is timed several times (best run counts) and a default is only
+replaced when a candidate beats it by MARGIN. chunk_size doubles as the stream
+decrypt memory ceiling, so it is only ever tuned downwards from the default.
+segment_size is not tuned: every segment carries seconds of pure-Python DES work,
+so per-segment overhead is noise and no short run can rank the candidates.
+"""
+
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Optional, Sequence
+
+PROFILE_VERSION = 2  # bumped when older profiles must be discarded
+REPEATS = 3  # timed runs per candidate; the fastest one counts
+MARGIN = 0.10  # a candidate must be this much faster than the default to replace it
+
+TUNED_SETTINGS = ("workers", "chunk_size")
+
+# Candidate values; the list contains the default of the setting it tunes.
+CHUNK_CANDIDATES = (4 * 1024, 16 * 1024, 64 * 1024)
+# Plaintext bytes given to each worker when probing the worker count.
+WORK_PER_WORKER = 8 * 1024
+
+_disabled = False
+_cached: Optional[Dict[str, int]] = None
+
+
+def profile_path() -> str:
+    """Location of the profile cache (%APPDATA% on Windows, else $XDG_CONFIG_HOME or ~/.config)."""
+    if os.name == "nt":
+        base = os.environ.get("APPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(base, "des-cipher", "tune.json")
+
+
+def machine_id() -> str:
+    """Identify this machine in the profile (host name, architecture and CPU count)."""
+    return f"{platform.node()}/{platform.machine()}/{os.cpu_count() or 1}"
+
+
+def disable():
+    """Ignore the cached profile for the rest of the process (the --no-tune switch)."""
+    global _disabled
+    _disabled = True
+
+
+def enabled() -> bool:
+    """False after disable() or when DES_NO_TUNE is set to anything but 0."""
+    return not _disabled and os.environ.get("DES_NO_TUNE", "") in ("", "0")
+
+
+def _read_profiles(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != PROFILE_VERSION:
+        return {}
+    machines = data.get("machines")
+    return machines if isinstance(machines, dict) else {}
+
+
+def _valid_settings(settings) -> Dict[str, int]:
+    """Keep only usable values: known settings holding positive ints."""
+    if not isinstance(settings, dict):
+        return {}
+    return {
+        name: value
+        for name, value in settings.items()
+        if name in TUNED_SETTINGS and type(value) is int and value > 0
+    }
+
+
+def load_profile() -> Dict[str, int]:
+    """Return this machine's tuned settings ({} if never tuned or tuning disabled)."""
+    global _cached
+    if not enabled():
+        return {}
+    if _cached is None:
+        entry = _read_profiles(profile_path()).get(machine_id())
+        _cached = _valid_settings(entry.get("settings") if isinstance(entry, dict) else None)
+    return _cached
+
+
+def save_profile(settings: Dict[str, int]) -> str:
+    """Store settings as this machine's profile; returns the profile path."""
+    global _cached
+    path = profile_path()
+    machines = _read_profiles(path)
+    machines[machine_id()] = {"settings": settings, "tuned_at": int(time.time())}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": PROFILE_VERSION, "machines": machines}, f, indent=2)
+    os.replace(tmp_path, path)
+    _cached = dict(settings)
+    return path
+
+
+def get(name: str, default):
+    """Tuned value of setting `name`, or default when untuned/disabled."""
+    return load_profile().get(name, default)
+
+
+def _best_time(run: Callable[[], object]) -> float:
+    """Fastest of REPEATS timed runs."""
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def _pick(
+    label: str,
+    candidates: Sequence[int],
+    default: Optional[int],
+    cost: Callable[[int], float],
+    log: Callable[[str], None],
+) -> Optional[int]:
+    """
+    Measure cost(value) (lower is better) for each candidate and return the cheapest,
+    unless default is among them and nothing beats it by MARGIN.
+    """
+    costs = {}
+    for value in candidates:
+        costs[value] = cost(value)
+        log(f"  {label}={value}: {costs[value]:.4g}")
+    best = min(costs, key=costs.get)
+    if default in costs and costs[best] > costs[default] * (1 - MARGIN):
+        return default
+    return best
+
+
+def calibrate(sample_size: int = 32 * 1024, log: Callable[[str], None] = print) -> Dict[str, int]:
+    """
+    Time encrypt/decrypt runs for each candidate setting and return the settings
+    that should override the defaults (not saved; see save_profile). A setting is
+    left out when its default won.
+    """
+    from . import cipher, segmented, stream
+
+    key = "tune-key"
+    settings: Dict[str, int] = {}
+    cpus = os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src, enc, dec = (os.path.join(tmp, name) for name in ("plain", "enc", "dec"))
+
+        def segmented_time(workers: int) -> float:
+            with open(src, "wb") as f:
+                f.write(os.urandom(workers * WORK_PER_WORKER))
+
+            def run():
+                segmented.encrypt_file(src, enc, key, segment_size=WORK_PER_WORKER, workers=workers)
+                segmented.decrypt_file(enc, dec, key, workers=workers)
+
+            return _best_time(run)
+
+        # Worker count: every worker gets WORK_PER_WORKER bytes in one segment, so a
+        # run lasts about as long for any count; compare seconds per byte.
+        log("segmented: workers (giây/byte)")
+        worker_candidates = sorted({1, cpus} | {w for w in (2, 4, 8, 16, 32) if w < cpus})
+        workers = _pick(
+            "workers",
+            worker_candidates,
+            cpus,
+            lambda w: segmented_time(w) / (w * WORK_PER_WORKER),
+            log,
+        )
+        if workers != cpus:
+            settings["workers"] = workers
+
+    # Streaming decrypt: chunk_size is also the memory ceiling, so never above the default.
+    text = os.urandom(sample_size // 2).hex()
+    cipher_hex, iv_hex = cipher.des_encrypt(text, key, mode="cfb")
+    log("stream: chunk_size (giây)")
+    chunk_size = _pick(
+        "chunk_size",
+        [c for c in CHUNK_CANDIDATES if c <= stream.DEFAULT_CHUNK_SIZE],
+        stream.DEFAULT_CHUNK_SIZE,
+        lambda c: _best_time(lambda: sum(1 for _ in stream.des_decrypt_stream(cipher_hex, key, "cfb", iv_hex, chunk_size=c))),
+        log,
+    )
+    if chunk_size != stream.DEFAULT_CHUNK_SIZE:
+        settings["chunk_size"] = chunk_size
+    return settings
+
+
+def run_tune(sample_size: int = 32 * 1024) -> int:
+    """Entry point of `des tune`: calibrate, save and report. Returns an exit code."""
+    print(f"Đang đo thông lượng với mẫu {sample_size} byte ({machine_id()})...")
+    try:
+        settings = calibrate(sample_size)
+        path = save_profile(settings)
+    except (OSError, ValueError) as e:
+        print(f"Tune thất bại: {e}", file=sys.stderr)
+        return 1
+    if settings:
+        for name, value in sorted(settings.items()):
+            print(f"{name} = {value}")
+    else:
+        print("Cấu hình mặc định đã nhanh nhất, không có giá trị nào thay đổi.")
+    print(f"Đã lưu profile vào {path}")
+    return 0
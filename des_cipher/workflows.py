@@ -6,6 +6,7 @@ import sys
 from typing import Optional
 from . import ui
 from . import cipher
+from . import segmented
 
 
 def _strip_saved_header(text: str) -> str:
@@ -76,6 +77,17 @@ def _read_iv(optional: bool = False) -> Optional[str]:
         print(ui.FG["red"] + "CFB cần IV. Thử lại." + ui.RESET)
 
 
+def _read_compression() -> Optional[str]:
+    """Prompts for the optional pre-encryption compression: none, zlib or lzma."""
+    while True:
+        comp = ui.prompt("Nén trước khi mã hóa (none/zlib/lzma) [none]: ").strip().lower() or "none"
+        if comp == "none":
+            return None
+        if comp in ("zlib", "lzma"):
+            return comp
+        print(ui.FG["red"] + "Chọn none, zlib hoặc lzma." + ui.RESET)
+
+
 def encrypt_flow():
     """Workflow for encrypting a message."""
     ui.clear()
@@ -85,9 +97,10 @@ def encrypt_flow():
     key = _read_key()
     mode = _read_mode()
     iv = _read_iv(optional=True) if mode == "cfb" else None
-    cipher_hex, iv_hex = cipher.des_encrypt(plaintext, key, mode=mode, iv=iv)
+    compress = _read_compression()
+    cipher_hex, iv_hex = cipher.des_encrypt(plaintext, key, mode=mode, iv=iv, compress=compress)
 
-    title = f"Ciphertext ({mode.upper()})"
+    title = f"Ciphertext ({mode.upper()}, {compress})" if compress else f"Ciphertext ({mode.upper()})"
     if iv_hex:
         print(ui.FG["cyan"] + f"IV (hex): {iv_hex}" + ui.RESET)
     ui.boxed(title, cipher_hex)
@@ -108,6 +121,42 @@ def decrypt_flow():
     post_output_actions(plaintext, key=key, iv=iv, label=f"Plaintext ({mode.upper()})")
 
 
+def segmented_file_flow():
+    """Workflow for encrypting/decrypting a large file with the segmented CFB container."""
+    ui.clear()
+    ui.banner()
+    ui.boxed(
+        "FILE LỚN (CFB PHÂN ĐOẠN)",
+        "File được chia thành các segment mã hóa CFB độc lập (IV riêng cho từng segment), "
+        "xử lý song song trên nhiều core.",
+    )
+    action = ui.prompt("Mã hóa [e] hoặc giải mã [d]: ").strip().lower()
+    if action not in ("e", "d"):
+        print(ui.FG["red"] + "Lựa chọn không hợp lệ." + ui.RESET)
+        ui.prompt("Nhấn Enter để tiếp tục...")
+        return
+    src = ui.prompt("File nguồn: ").strip()
+    dst = ui.prompt("File đích: ").strip()
+    key = _read_key()
+    spinner = ui.Spinner("Đang xử lý...")
+    try:
+        if action == "e":
+            iv = _read_iv(optional=True)
+            spinner.start()
+            iv_hex = segmented.encrypt_file(src, dst, key, iv=iv)
+            spinner.stop()
+            print(ui.FG["cyan"] + f"IV gốc (hex, đã lưu trong header): {iv_hex}" + ui.RESET)
+        else:
+            spinner.start()
+            segmented.decrypt_file(src, dst, key)
+            spinner.stop()
+        print(ui.FG["green"] + f"Đã ghi {dst}" + ui.RESET)
+    except (OSError, ValueError) as e:
+        spinner.stop()
+        print(ui.FG["red"] + f"Lỗi: {e}" + ui.RESET)
+    ui.prompt("Nhấn Enter để tiếp tục...")
+
+
 def post_output_actions(
     text: str,
     key: Optional[str] = None,
@@ -162,7 +211,9 @@ def show_help():
         "- Mã hóa/giải mã bằng thuật toán DES với mode ecb hoặc cfb.\n"
         "- ECB dùng PKCS#7 padding và trả ciphertext hex.\n"
         "- CFB cần IV 8 byte (16 hex hoặc 8 ký tự); encrypt trả về IV và ciphertext tách biệt (hex), decrypt yêu cầu IV nhập thủ công. CFB không cần padding và hỗ trợ chuỗi dài bất kỳ.\n"
+        "- Có thể nén (zlib/lzma) trước khi mã hóa để giảm số block DES; thông tin nén nằm trong dữ liệu mã hóa nên giải mã tự giải nén.\n"
         "- Văn bản dài có thể đọc từ file (chọn 'f') hoặc pipe: cat file.txt | des\n"
+        "- File lớn: menu 3 mã hóa file thành container CFB phân đoạn (segment độc lập, xử lý song song, đọc/mã hóa lại từng segment qua des_cipher.segmented).\n"
         "- Sau khi có kết quả, bạn có thể copy hoặc lưu file.\n"
         "- Nếu muốn giao diện xịn hơn: pip install pyfiglet colorama pyperclip\n"
     )
@@ -0,0 +1,151 @@
+import asyncio
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from des_cipher import aio, cipher
+
+KEY = "12345678"
+IV = "0011223344556677"
+
+
+class MemoryWriter:
+    """Minimal StreamWriter stand-in: collects bytes, drain() yields to the loop."""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.drains = 0
+
+    def write(self, chunk):
+        self.data += chunk
+
+    async def drain(self):
+        self.drains += 1
+        await asyncio.sleep(0)
+
+
+async def odd_pieces(data, seed=0):
+    rng = random.Random(seed)
+    i = 0
+    while i < len(data):
+        n = rng.randint(1, 29)
+        yield data[i:i + n]
+        i += n
+
+
+def reader_for(data):
+    reader = asyncio.StreamReader()
+    reader.feed_data(data)
+    reader.feed_eof()
+    return reader
+
+
+async def collect(chunks):
+    return b"".join([c async for c in chunks])
+
+
+@pytest.mark.parametrize("length", [0, 1, 8, 13, 301])
+def test_encrypt_stream_matches_des_encrypt_cfb(length):
+    text = "é" * length
+    expected, _ = cipher.des_encrypt(text, KEY, "cfb", iv=IV)
+
+    async def run():
+        writer = MemoryWriter()
+        iv = await aio.encrypt_stream(odd_pieces(text.encode("utf-8")), writer, KEY, "cfb", IV, chunk_size=16)
+        return iv, bytes(writer.data)
+
+    iv, data = asyncio.run(run())
+    assert iv == IV
+    assert data.hex() == expected
+
+
+def test_encrypt_stream_generates_iv_and_decrypts():
+    payload = b"hello asyncio " * 40
+
+    async def run():
+        enc = MemoryWriter()
+        iv = await aio.encrypt_stream(reader_for(payload), enc, KEY, "cfb", chunk_size=64)
+        dec = MemoryWriter()
+        await aio.decrypt_stream(reader_for(bytes(enc.data)), dec, KEY, "cfb", iv, chunk_size=64)
+        return enc, bytes(dec.data)
+
+    enc, plain = asyncio.run(run())
+    assert plain == payload
+    assert enc.drains >= len(payload) // 64
+
+
+@pytest.mark.parametrize("length", [0, 7, 8, 100])
+def test_ecb_padding_round_trip(length):
+    payload = bytes(range(256))[:length]
+
+    async def run():
+        ct = await collect(aio.encrypt_iter(odd_pieces(payload), KEY, "ecb", chunk_size=16))
+        pt = await collect(aio.decrypt_iter(odd_pieces(ct, seed=1), KEY, "ecb", chunk_size=16))
+        return ct, pt
+
+    ct, pt = asyncio.run(run())
+    assert len(ct) == (length // 8 + 1) * 8
+    assert pt == payload
+
+
+def test_ecb_bad_length_rejected():
+    async def run():
+        await collect(aio.decrypt_iter(odd_pieces(b"\x00" * 12), KEY, "ecb"))
+
+    with pytest.raises(ValueError, match="multiple of block size"):
+        asyncio.run(run())
+
+
+def test_ecb_bad_padding_rejected():
+    bad = cipher._ecb_encrypt_bytes(b"abcdefg\x00", cipher._round_keys_for(KEY, "encrypt"))
+
+    async def run():
+        await collect(aio.decrypt_iter(odd_pieces(bad), KEY, "ecb"))
+
+    with pytest.raises(ValueError, match="padding"):
+        asyncio.run(run())
+
+
+def test_cfb_requires_iv():
+    async def run():
+        await collect(aio.encrypt_iter(odd_pieces(b"x"), KEY, "cfb"))
+
+    with pytest.raises(ValueError, match="IV"):
+        asyncio.run(run())
+
+
+def test_event_loop_keeps_running_during_encryption():
+    text = "x" * 16000
+
+    async def run(executor):
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.005)
+
+        task = asyncio.create_task(ticker())
+        start = time.perf_counter()
+        c, _ = await aio.encrypt(text, KEY, executor=executor)
+        ct = await collect(aio.encrypt_iter(odd_pieces(text.encode()), KEY, chunk_size=1024, executor=executor))
+        elapsed = time.perf_counter() - start
+        task.cancel()
+        return c, ct, ticks, elapsed
+
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        c, ct, ticks, elapsed = asyncio.run(run(executor))
+    assert ct.hex() == c
+    gaps = [b - a for a, b in zip(ticks, ticks[1:])]
+    assert max(gaps) < 0.25
+    assert len(ticks) >= elapsed / 0.05
+
+
+def test_async_text_api_round_trip():
+    async def run():
+        c, iv = await aio.encrypt("xin chào", KEY, "cfb", compress="zlib")
+        return await aio.decrypt(c, KEY, "cfb", iv)
+
+    assert asyncio.run(run()) == "xin chào"
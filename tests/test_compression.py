@@ -0,0 +1,88 @@
+import pytest
+
+from des_cipher import cipher, compression, metrics, stream
+
+KEY = "12345678"
+TEXT = "2024-01-01 INFO request served in 12ms\n" * 200
+
+
+@pytest.mark.parametrize("compress", ["zlib", "lzma"])
+@pytest.mark.parametrize("mode", ["ecb", "cfb"])
+def test_round_trip_shrinks_ciphertext(compress, mode):
+    plain, _ = cipher.des_encrypt(TEXT, KEY, mode, iv="0011223344556677" if mode == "cfb" else None)
+    packed, iv = cipher.des_encrypt(TEXT, KEY, mode, compress=compress)
+    assert len(packed) * 5 < len(plain)
+    assert cipher.des_decrypt(packed, KEY, mode, iv) == TEXT
+
+
+@pytest.mark.parametrize("compress", ["zlib", "lzma"])
+def test_incompressible_data_falls_back_to_raw(compress):
+    text = "xQ7é"
+    raw = text.encode("utf-8")
+    assert compression.frame(raw, compress) == raw
+    c, iv = cipher.des_encrypt(text, KEY, "cfb", compress=compress)
+    assert len(c) == 2 * len(raw)
+    assert cipher.des_decrypt(c, KEY, "cfb", iv) == text
+
+
+def test_empty_text_round_trip():
+    for compress in ("zlib", "lzma"):
+        c, _ = cipher.des_encrypt("", KEY, compress=compress)
+        assert cipher.des_decrypt(c, KEY) == ""
+
+
+def test_unframe_passes_plain_text_through():
+    assert compression.unframe("héllo".encode("utf-8")) == "héllo".encode("utf-8")
+
+
+def test_unsupported_algorithm_rejected():
+    with pytest.raises(ValueError, match="Unsupported compression"):
+        cipher.des_encrypt("x", KEY, compress="gzip")
+
+
+def test_unknown_frame_rejected():
+    with pytest.raises(ValueError, match="Unknown compression"):
+        compression.unframe(bytes([compression.MARKER, ord("?")]) + b"data")
+
+
+@pytest.mark.parametrize("compress", ["zlib", "lzma"])
+def test_truncated_frame_rejected(compress):
+    framed = compression.frame(TEXT.encode("utf-8"), compress)
+    with pytest.raises(ValueError, match="Truncated"):
+        compression.unframe(framed[:-4])
+    with pytest.raises(ValueError, match="Truncated"):
+        compression.unframe(framed[:1])
+
+
+@pytest.mark.parametrize("compress", ["zlib", "lzma"])
+def test_corrupt_frame_rejected(compress):
+    framed = bytearray(compression.frame(TEXT.encode("utf-8"), compress))
+    framed[2:10] = b"\xff" * 8
+    with pytest.raises(ValueError):
+        compression.unframe(bytes(framed))
+
+
+@pytest.mark.parametrize("compress", ["zlib", "lzma"])
+def test_trailing_data_rejected(compress):
+    framed = compression.frame(TEXT.encode("utf-8"), compress)
+    with pytest.raises(ValueError, match="Trailing"):
+        compression.unframe(framed + b"junk")
+
+
+@pytest.mark.parametrize("compress", ["zlib", "lzma"])
+def test_trailing_data_rejected_when_streaming(compress):
+    iv = "0011223344556677"
+    c, _ = cipher.des_encrypt(TEXT, KEY, "cfb", iv, compress=compress)
+    metrics.reset()
+    with pytest.raises(ValueError, match="Trailing"):
+        "".join(stream.des_decrypt_stream([c, "00" * 16], KEY, "cfb", iv))
+    with pytest.raises(ValueError, match="Trailing"):
+        cipher.des_decrypt(c + "00" * 16, KEY, "cfb", iv)
+    errors = {(row["op"], row["kind"]): row["count"] for row in metrics.snapshot()["errors"]}
+    assert errors[("decrypt", "bad_compressed")] == 2
+
+
+def test_truncated_ciphertext_rejected():
+    c, iv = cipher.des_encrypt(TEXT, KEY, "cfb", compress="zlib")
+    with pytest.raises(ValueError):
+        cipher.des_decrypt(c[:-8], KEY, "cfb", iv)
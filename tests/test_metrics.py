@@ -0,0 +1,98 @@
+import json
+
+import pytest
+
+from des_cipher import cipher, metrics
+
+KEY = "12345678"
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def _ops(snap):
+    return {(row["op"], row["mode"]): row for row in snap["operations"]}
+
+
+def _errors(snap):
+    return {(row["op"], row["kind"]): row["count"] for row in snap["errors"]}
+
+
+def test_bad_padding_counts_error():
+    # Re-encrypt a block whose last byte is 0: decrypts to an invalid pad byte.
+    bad = cipher._ecb_encrypt_bytes(b"\x00" * 8, cipher._round_keys_for(KEY, "encrypt")).hex()
+    with pytest.raises(ValueError):
+        cipher.des_decrypt(bad, KEY)
+    assert _errors(metrics.snapshot())[("decrypt", "bad_padding")] == 1
+
+
+def test_invalid_hex_counts_error():
+    with pytest.raises(ValueError):
+        cipher.des_decrypt("zz", KEY)
+    assert _errors(metrics.snapshot()) == {("decrypt", "invalid_hex"): 1}
+
+
+def test_repeated_key_is_cache_hit():
+    cipher.clear_key_cache()
+    cipher.des_encrypt("a", KEY)
+    cipher.des_encrypt("b", KEY)
+    assert metrics.snapshot()["key_cache"] == {"hit": 1, "miss": 1}
+
+
+def test_key_cache_can_be_disabled():
+    size = cipher._ROUND_KEY_CACHE_SIZE
+    cipher.set_key_cache_size(0)
+    try:
+        cipher.des_encrypt("a", KEY)
+        cipher.des_encrypt("b", KEY)
+        assert metrics.snapshot()["key_cache"] == {"hit": 0, "miss": 2}
+    finally:
+        cipher.set_key_cache_size(size)
+
+
+def test_bytes_count_plaintext_for_both_directions():
+    text = "log line repeated\n" * 50
+    for compress in (None, "zlib"):
+        for mode in ("ecb", "cfb"):
+            c, iv = cipher.des_encrypt(text, KEY, mode, compress=compress)
+            cipher.des_decrypt(c, KEY, mode, iv)
+    ops = _ops(metrics.snapshot())
+    for mode in ("ecb", "cfb"):
+        assert ops[("encrypt", mode)]["bytes"] == ops[("decrypt", mode)]["bytes"] == 2 * len(text)
+        assert ops[("encrypt", mode)]["count"] == 2
+
+
+def test_histogram_buckets_are_cumulative():
+    reg = metrics.Metrics()
+    reg.record_operation("encrypt", "ecb", 10, 0.002)
+    reg.record_operation("encrypt", "ecb", 64, 0.0005)
+    reg.record_operation("encrypt", "ecb", 65, 100.0)
+    hists = {h["size_le"]: h for h in reg.snapshot()["latency"]}
+    assert set(hists) == {"64", "1024"}
+    small = {b["le"]: b["count"] for b in hists["64"]["buckets"]}
+    assert small[0.001] == 1 and small[0.005] == 2 and small["+Inf"] == 2
+    big = {b["le"]: b["count"] for b in hists["1024"]["buckets"]}
+    assert big[60.0] == 0 and big["+Inf"] == 1
+    assert hists["64"]["sum"] == pytest.approx(0.0025)
+
+
+def test_json_and_prometheus_output(tmp_path):
+    cipher.des_encrypt("hello", KEY)
+    assert json.loads(metrics.to_json())["operations"][0]["count"] == 1
+    text = metrics.to_prometheus()
+    assert 'des_operations_total{op="encrypt",mode="ecb"} 1' in text
+    assert 'des_bytes_total{op="encrypt",mode="ecb"} 5' in text
+    assert 'des_operation_duration_seconds_count{op="encrypt",mode="ecb",size_le="64"} 1' in text
+    assert "# TYPE des_operation_duration_seconds histogram" in text
+
+    path = tmp_path / "des.prom"
+    metrics.write(str(path))
+    assert path.read_text(encoding="utf-8") == text
+    metrics.write(str(path), fmt="json")
+    assert json.loads(path.read_text(encoding="utf-8"))["key_cache"]["miss"] >= 0
+    with pytest.raises(ValueError):
+        metrics.write(str(path), fmt="xml")
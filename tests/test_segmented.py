@@ -0,0 +1,135 @@
+import os
+import struct
+
+import pytest
+
+from des_cipher import segmented
+
+KEY = "12345678"
+SEGMENT = 64
+
+
+@pytest.fixture
+def plain_file(tmp_path):
+    data = os.urandom(5 * SEGMENT + 13)
+    path = tmp_path / "plain.bin"
+    path.write_bytes(data)
+    return path, data
+
+
+def _encrypt(plain_path, tmp_path):
+    container = tmp_path / "container.bin"
+    segmented.encrypt_file(str(plain_path), str(container), KEY, segment_size=SEGMENT, workers=1)
+    return container
+
+
+def _segment_ciphertext(container, index):
+    header = segmented.read_header(str(container))
+    offset, length, _ = header.index[index]
+    with open(container, "rb") as f:
+        f.seek(offset)
+        return f.read(length)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_round_trip(plain_file, tmp_path, workers):
+    plain_path, data = plain_file
+    container = tmp_path / "container.bin"
+    iv = segmented.encrypt_file(str(plain_path), str(container), KEY, segment_size=SEGMENT, workers=workers)
+    out = tmp_path / "out.bin"
+    segmented.decrypt_file(str(container), str(out), KEY, workers=workers)
+    assert out.read_bytes() == data
+
+    header = segmented.read_header(str(container))
+    assert header.iv.hex() == iv
+    assert header.segment_count == 6
+    assert header.total_length == len(data)
+    assert header.index[-1][1] == 13
+
+
+def test_empty_file(tmp_path):
+    src = tmp_path / "empty.bin"
+    src.write_bytes(b"")
+    container = _encrypt(src, tmp_path)
+    out = tmp_path / "out.bin"
+    segmented.decrypt_file(str(container), str(out), KEY, workers=1)
+    assert out.read_bytes() == b""
+
+
+def test_read_segment(plain_file, tmp_path):
+    plain_path, data = plain_file
+    container = _encrypt(plain_path, tmp_path)
+    assert segmented.read_segment(str(container), KEY, 2) == data[2 * SEGMENT:3 * SEGMENT]
+    assert segmented.read_segment(str(container), KEY, 5) == data[5 * SEGMENT:]
+    with pytest.raises(ValueError):
+        segmented.read_segment(str(container), KEY, 6)
+
+
+def test_reencrypt_segment_uses_fresh_iv(plain_file, tmp_path):
+    plain_path, data = plain_file
+    container = _encrypt(plain_path, tmp_path)
+    old_ct = _segment_ciphertext(container, 1)
+
+    new_plain = bytes(b ^ 0x02 for b in data[SEGMENT:2 * SEGMENT])
+    segmented.reencrypt_segment(str(container), KEY, 1, new_plain)
+    new_ct = _segment_ciphertext(container, 1)
+
+    assert segmented.read_header(str(container)).index[1][2] == 1
+    assert segmented.read_segment(str(container), KEY, 1) == new_plain
+    assert segmented.read_segment(str(container), KEY, 2) == data[2 * SEGMENT:3 * SEGMENT]
+    # A reused keystream would make old_ct XOR new_ct equal P XOR P' (all 0x02).
+    xor = bytes(a ^ b for a, b in zip(old_ct[:8], new_ct[:8]))
+    assert xor != b"\x02" * 8
+
+    # Writing the same plaintext back still changes the ciphertext.
+    segmented.reencrypt_segment(str(container), KEY, 1, new_plain)
+    assert _segment_ciphertext(container, 1) != new_ct
+
+    with pytest.raises(ValueError):
+        segmented.reencrypt_segment(str(container), KEY, 1, b"short")
+
+
+def test_corrupted_index_offset_rejected(plain_file, tmp_path):
+    plain_path, _ = plain_file
+    container = _encrypt(plain_path, tmp_path)
+    raw = bytearray(container.read_bytes())
+    entry = struct.Struct(">QII")
+    pos = 32  # first index entry follows the 32-byte header
+    offset, length, generation = entry.unpack_from(raw, pos)
+    entry.pack_into(raw, pos, 0, length, generation)
+    container.write_bytes(bytes(raw))
+    before = container.read_bytes()
+
+    with pytest.raises(ValueError):
+        segmented.reencrypt_segment(str(container), KEY, 0, b"x" * length)
+    with pytest.raises(ValueError):
+        segmented.read_segment(str(container), KEY, 0)
+    assert container.read_bytes() == before
+
+
+def test_bad_magic_rejected(tmp_path):
+    path = tmp_path / "junk.bin"
+    path.write_bytes(b"NOTADESCONTAINER" * 4)
+    with pytest.raises(ValueError):
+        segmented.read_header(str(path))
+
+
+def test_forged_segment_count_rejected_quickly(tmp_path):
+    # count=0 with a 1 TiB length must not make the reader build a 2^37-entry layout.
+    path = tmp_path / "forged.bin"
+    path.write_bytes(struct.pack(">8s8sIIQ", segmented.MAGIC, b"\0" * 8, 8, 0, 1 << 40))
+    with pytest.raises(ValueError):
+        segmented.read_header(str(path))
+    with pytest.raises(ValueError):
+        segmented.read_segment(str(path), KEY, 0)
+    with pytest.raises(ValueError):
+        segmented.decrypt_file(str(path), str(tmp_path / "out.bin"), KEY, workers=1)
+    with pytest.raises(ValueError):
+        segmented.reencrypt_segment(str(path), KEY, 0, b"")
+
+
+def test_too_many_segments_rejected(plain_file, tmp_path, monkeypatch):
+    plain_path, _ = plain_file
+    monkeypatch.setattr(segmented, "_MAX_SEGMENTS", 5)
+    with pytest.raises(ValueError):
+        _encrypt(plain_path, tmp_path)
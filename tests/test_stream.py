@@ -0,0 +1,117 @@
+import tracemalloc
+
+import pytest
+
+from des_cipher import cipher, stream
+
+KEY = "12345678"
+CHUNK = 2048
+# Working set allowed per step, as a multiple of chunk_size (includes fixed interpreter overhead).
+K = 12
+
+
+def _pieces(cipher_hex, size):
+    for i in range(0, len(cipher_hex), size):
+        yield cipher_hex[i:i + size]
+
+
+def _peak(cipher_hex, mode, iv):
+    pieces = _pieces(cipher_hex, 2 * CHUNK)
+    tracemalloc.start()
+    try:
+        for _ in stream.des_decrypt_stream(pieces, KEY, mode, iv, chunk_size=CHUNK):
+            pass
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize("mode", ["ecb", "cfb"])
+def test_round_trip_with_odd_pieces(mode):
+    text = "DES streaming é€😀 " * 40
+    c, iv = cipher.des_encrypt(text, KEY, mode)
+    for piece_size in (1, 7, 33):
+        out = "".join(stream.des_decrypt_stream(_pieces(c, piece_size), KEY, mode, iv, chunk_size=16))
+        assert out == text
+    assert "".join(stream.des_decrypt_stream(c, KEY, mode, iv, chunk_size=16)) == text
+
+
+@pytest.mark.parametrize("mode", ["ecb", "cfb"])
+def test_peak_memory_bounded_by_chunk_size(mode):
+    small, iv = cipher.des_encrypt("x" * 6000, KEY, mode, iv="0011223344556677" if mode == "cfb" else None)
+    large, _ = cipher.des_encrypt("x" * 30000, KEY, mode, iv=iv)
+    _peak(small, mode, iv)  # warm caches (key schedule, metrics entries)
+
+    peak_small = _peak(small, mode, iv)
+    peak_large = _peak(large, mode, iv)
+
+    assert peak_small <= K * CHUNK
+    assert peak_large <= K * CHUNK
+    # 5x the input must not mean more memory.
+    assert peak_large <= peak_small + CHUNK
+
+
+def test_finalize_rejects_bad_padding():
+    round_keys = cipher._round_keys_for(KEY, "encrypt")
+    bad = cipher._ecb_encrypt_bytes(b"abcdefg\x00", round_keys).hex()
+    dec = stream.StreamDecryptor(KEY, "ecb", chunk_size=CHUNK)
+    assert dec.update(bad) == ""
+    with pytest.raises(ValueError, match="padding"):
+        dec.finalize()
+
+
+def test_finalize_rejects_odd_hex():
+    c, _ = cipher.des_encrypt("hello", KEY)
+    dec = stream.StreamDecryptor(KEY, "ecb", chunk_size=CHUNK)
+    dec.update(c + "a")
+    with pytest.raises(ValueError, match="hex"):
+        dec.finalize()
+
+
+def test_finalize_rejects_partial_ecb_block():
+    c, _ = cipher.des_encrypt("hello", KEY)
+    dec = stream.StreamDecryptor(KEY, "ecb", chunk_size=CHUNK)
+    dec.update(c[:-2])
+    with pytest.raises(ValueError, match="multiple of block size"):
+        dec.finalize()
+
+
+def test_cfb_requires_iv():
+    with pytest.raises(ValueError):
+        stream.StreamDecryptor(KEY, "cfb")
+
+
+# Decompressor state allowed on top of the per-step working set (zlib window, small LZMA dictionary).
+CODEC_STATE = 128 * 1024
+
+
+@pytest.mark.parametrize("compress", ["zlib", "lzma"])
+def test_compressed_peak_memory_bounded(compress):
+    small, _ = cipher.des_encrypt("abc " * 5000, KEY, "ecb", compress=compress)
+    large, _ = cipher.des_encrypt("abc " * 50000, KEY, "ecb", compress=compress)
+    _peak(small, "ecb", None)
+
+    peak_small = _peak(small, "ecb", None)
+    peak_large = _peak(large, "ecb", None)
+
+    assert peak_small <= K * CHUNK + CODEC_STATE
+    assert peak_large <= peak_small + CHUNK
+
+
+@pytest.mark.parametrize("compress", ["zlib", "lzma"])
+def test_decompression_bomb_stays_bounded(compress):
+    # 8 MB of text compresses to a few KB; decrypting must not inflate it in one go.
+    bomb, iv = cipher.des_encrypt("\0" * (8 * 1024 * 1024), KEY, "cfb", compress=compress)
+    assert len(bomb) < 64 * 1024
+    pieces = _pieces(bomb, 2 * CHUNK)
+    total = 0
+    tracemalloc.start()
+    try:
+        for text in stream.des_decrypt_stream(pieces, KEY, "cfb", iv, chunk_size=CHUNK):
+            assert len(text) <= CHUNK
+            total += len(text)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert total == 8 * 1024 * 1024
+    assert peak <= K * CHUNK + CODEC_STATE
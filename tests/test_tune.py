@@ -0,0 +1,132 @@
+import json
+import os
+
+import pytest
+
+from des_cipher import cli, stream, tune
+
+
+@pytest.fixture(autouse=True)
+def isolated_profile(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path))
+    monkeypatch.delenv("DES_NO_TUNE", raising=False)
+    monkeypatch.setattr(tune, "_cached", None)
+    monkeypatch.setattr(tune, "_disabled", False)
+    yield
+
+
+@pytest.mark.skipif(os.name == "nt", reason="XDG layout")
+def test_profile_path_uses_xdg_config_home(tmp_path):
+    assert tune.profile_path() == os.path.join(str(tmp_path), "des-cipher", "tune.json")
+
+
+@pytest.mark.skipif(os.name == "nt", reason="XDG layout")
+def test_profile_path_falls_back_to_home(tmp_path, monkeypatch):
+    monkeypatch.delenv("XDG_CONFIG_HOME")
+    monkeypatch.setenv("HOME", str(tmp_path))
+    assert tune.profile_path() == os.path.join(str(tmp_path), ".config", "des-cipher", "tune.json")
+
+
+def test_save_and_load_round_trip(monkeypatch):
+    path = tune.save_profile({"workers": 3, "chunk_size": 4096})
+    assert os.path.exists(path)
+    monkeypatch.setattr(tune, "_cached", None)
+    assert tune.load_profile() == {"workers": 3, "chunk_size": 4096}
+    assert tune.get("workers", None) == 3
+    assert tune.get("segment_size", 123) == 123
+
+
+def test_profiles_are_kept_per_machine(monkeypatch):
+    monkeypatch.setattr(tune, "machine_id", lambda: "laptop")
+    tune.save_profile({"workers": 2})
+    monkeypatch.setattr(tune, "machine_id", lambda: "batch-host")
+    monkeypatch.setattr(tune, "_cached", None)
+    assert tune.load_profile() == {}
+    tune.save_profile({"workers": 32})
+    monkeypatch.setattr(tune, "machine_id", lambda: "laptop")
+    monkeypatch.setattr(tune, "_cached", None)
+    assert tune.load_profile() == {"workers": 2}
+
+
+def _write_profile(text):
+    path = tune.profile_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+@pytest.mark.parametrize("text", [
+    "not json",
+    "[]",
+    '{"version": 1, "machines": {}}',
+    '{"version": 2, "machines": []}',
+    '{"version": 2, "machines": {"%s": []}}',
+    '{"version": 2, "machines": {"%s": {"settings": [1, 2]}}}',
+])
+def test_corrupt_or_old_profile_ignored(text):
+    _write_profile(text.replace("%s", tune.machine_id()))
+    assert tune.load_profile() == {}
+    assert stream.resolve_chunk_size(None) == stream.DEFAULT_CHUNK_SIZE
+
+
+def test_invalid_settings_dropped():
+    settings = {
+        "chunk_size": 0,
+        "workers": -2,
+        "segment_size": 1001,
+        "other": "fast",
+        "flag": True,
+    }
+    _write_profile(json.dumps({"version": tune.PROFILE_VERSION, "machines": {tune.machine_id(): {"settings": settings}}}))
+    assert tune.load_profile() == {}
+    assert stream.StreamDecryptor("12345678").chunk_size == stream.DEFAULT_CHUNK_SIZE
+
+    settings = {"chunk_size": 4096, "workers": 0, "segment_size": 1 << 16}
+    _write_profile(json.dumps({"version": tune.PROFILE_VERSION, "machines": {tune.machine_id(): {"settings": settings}}}))
+    tune._cached = None
+    assert tune.load_profile() == {"chunk_size": 4096}
+
+
+def test_des_no_tune_env_ignores_profile(monkeypatch):
+    tune.save_profile({"workers": 3})
+    monkeypatch.setenv("DES_NO_TUNE", "1")
+    assert tune.get("workers", None) is None
+    monkeypatch.setenv("DES_NO_TUNE", "0")
+    assert tune.get("workers", None) == 3
+
+
+def test_disable_ignores_profile():
+    tune.save_profile({"workers": 3})
+    tune.disable()
+    assert tune.get("workers", None) is None
+
+
+def test_tuned_chunk_size_never_exceeds_default():
+    tune.save_profile({"chunk_size": 4 * stream.DEFAULT_CHUNK_SIZE})
+    assert stream.resolve_chunk_size(None) == stream.DEFAULT_CHUNK_SIZE
+    tune.save_profile({"chunk_size": 4096})
+    assert stream.resolve_chunk_size(None) == 4096
+    assert stream.resolve_chunk_size(100) == 100
+
+
+def test_pick_keeps_default_within_margin():
+    costs = {1: 1.00, 2: 0.95, 4: 1.2}
+    assert tune._pick("x", [1, 2, 4], 1, costs.get, lambda _: None) == 1
+    costs[2] = 0.85
+    assert tune._pick("x", [1, 2, 4], 1, costs.get, lambda _: None) == 2
+
+
+def test_no_tune_flag_parsing():
+    assert cli.parse_args(["--no-tune"]).no_tune is True
+    args = cli.parse_args([])
+    assert args.no_tune is False and args.command is None
+    args = cli.parse_args(["tune", "--sample-size", "4096"])
+    assert args.command == "tune" and args.sample_size == 4096
+
+
+def test_main_with_no_tune_disables_profile(monkeypatch):
+    tune.save_profile({"workers": 3})
+    monkeypatch.setattr(cli.sys, "argv", ["des", "--no-tune"])
+    monkeypatch.setattr(cli, "main_loop", lambda: None)
+    cli.main()
+    assert not tune.enabled()